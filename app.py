@@ -1,6 +1,30 @@
 import streamlit as st
 import logic
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Builds from different sessions run side by side, as they did on their own script threads
+BUILD_WORKERS = 8
+# Upper bound on waiting for a draft's image prefetch before building without it
+PREFETCH_WAIT_SECONDS = 30
+
+
+@st.cache_resource
+def get_build_pool():
+    """Background workers shared by all sessions for building .pptx files."""
+    return ThreadPoolExecutor(max_workers=BUILD_WORKERS)
+
+
+@st.cache_resource
+def get_prefetch_pool():
+    """Background workers that download a draft's images while the user reviews it."""
+    return ThreadPoolExecutor(max_workers=2)
+
+
+def start_image_prefetch(ppt_structure):
+    st.session_state.image_future = get_prefetch_pool().submit(logic.prefetch_slide_images, ppt_structure)
 
 
 # --- PAGE CONFIGURATION ---
@@ -10,7 +34,7 @@ st.set_page_config(page_title="AI PPT Agent", page_icon="✨", layout="centered"
 # --- SIDEBAR ---
 with st.sidebar:
     st.header("Configuration")
-    if logic.client:
+    if logic.get_groq_client():
         st.success("Groq Connection: Successful")
         st.info(f"Using Model: {logic.model_name}")
     else:
@@ -56,15 +80,24 @@ if prompt := st.chat_input("Type your message..."):
            
             # 1. Initial Generation
             if st.session_state.ppt_structure is None:
-                response = logic.generate_slide_content(prompt)
+                # A new topic replaces the previous deck; don't hold its bytes any longer
+                st.session_state.pop("last_ppt", None)
+                placeholder = st.empty()
+                response = logic.generate_slide_content(
+                    prompt,
+                    on_token=lambda text: placeholder.code(text, language="json")
+                )
+                placeholder.empty()
                
                 if response and "Error:" in response[:10]:
                     st.error(response)
-                elif response:
-                    st.session_state.ppt_structure = response
+                elif response and (plan := logic.parse_plan(response)) is not None:
+                    # Keep the parsed dict; it is only re-serialized for the feedback prompt
+                    st.session_state.ppt_structure = plan
+                    start_image_prefetch(plan)
                     st.write("Here is the draft plan:")
-                    st.json(response)
-                    st.session_state.messages.append({"role": "assistant", "content": response, "is_json": True})
+                    st.json(plan)
+                    st.session_state.messages.append({"role": "assistant", "content": plan, "is_json": True})
                    
                     follow_up_message = "Type 'Yes' to generate the file, or type feedback to change it."
                     st.write(follow_up_message)
@@ -78,18 +111,48 @@ if prompt := st.chat_input("Type your message..."):
                 if prompt.lower() in ["yes", "y", "looks good", "ok"]:
                     st.write(f"Generating images and building PowerPoint with theme {theme_color}... ⏳")
                    
+                    # Build off the script thread; the worker only writes to progress_state
+                    progress_state = {"fraction": 0.0, "message": "Starting..."}
+                    def on_progress(fraction, message):
+                        progress_state.update(fraction=fraction, message=message)
+
+
+                    # Give an in-flight prefetch a bounded head start so the build reuses its cached images
+                    progress_bar = st.progress(0.0, text="Fetching images...")
+                    image_future = st.session_state.pop("image_future", None)
+                    started = time.monotonic()
+                    while image_future is not None and not image_future.done():
+                        waited = time.monotonic() - started
+                        if waited >= PREFETCH_WAIT_SECONDS:
+                            break
+                        progress_bar.progress(0.1 * waited / PREFETCH_WAIT_SECONDS, text="Fetching images...")
+                        time.sleep(0.2)
+
+
                     # Pass the selected theme_color to the logic function
-                    filename = logic.create_ppt_file(st.session_state.ppt_structure, include_images=True, theme_color=theme_color)
-                   
-                    if filename:
+                    build_future = get_build_pool().submit(
+                        logic.create_ppt_file,
+                        st.session_state.ppt_structure,
+                        include_images=True,
+                        theme_color=theme_color,
+                        on_progress=on_progress
+                    )
+                    while not build_future.done():
+                        progress_bar.progress(progress_state["fraction"], text=progress_state["message"])
+                        time.sleep(0.2)
+                    progress_bar.empty()
+
+
+                    try:
+                        result = build_future.result()
+                    except Exception as e:
+                        print(f"PPT build failed: {e}")
+                        result = None
+               
+                    if result:
+                        # Rendered below the chat so the button survives reruns (including its own click)
+                        st.session_state.last_ppt = result
                         st.success("Presentation Ready!")
-                        with open(filename, "rb") as file:
-                            st.download_button(
-                                label="📥 Download .pptx",
-                                data=file,
-                                file_name=filename,
-                                mime="application/vnd.openxmlformats-officedocument.presentationml.presentation"
-                            )
                         # Reset for next presentation
                         st.session_state.ppt_structure = None
                         st.session_state.messages.append({"role": "assistant", "content": "Great! What should we create next?"})
@@ -99,15 +162,35 @@ if prompt := st.chat_input("Type your message..."):
 
                 else: # Handle feedback
                     st.write("Refining content based on your feedback...")
-                    response = logic.generate_slide_content(topic=prompt, feedback=prompt, current_content=st.session_state.ppt_structure)
-                    if response and "Error:" not in response:
-                        st.session_state.ppt_structure = response
+                    placeholder = st.empty()
+                    response = logic.generate_slide_content(
+                        topic=prompt,
+                        feedback=prompt,
+                        current_content=st.session_state.ppt_structure,
+                        on_token=lambda text: placeholder.code(text, language="json")
+                    )
+                    placeholder.empty()
+                    if response and "Error:" not in response and (plan := logic.parse_plan(response)) is not None:
+                        st.session_state.ppt_structure = plan
+                        start_image_prefetch(plan)
                         st.write("Updated Draft:")
-                        st.json(response)
-                        st.session_state.messages.append({"role": "assistant", "content": response, "is_json": True})
+                        st.json(plan)
+                        st.session_state.messages.append({"role": "assistant", "content": plan, "is_json": True})
                        
                         follow_up_message = "How is this? Type 'Yes' to generate."
                         st.write(follow_up_message)
                         st.session_state.messages.append({"role": "assistant", "content": follow_up_message})
                     else:
                         st.error(response)
+
+
+# --- DOWNLOAD ---
+# Lives outside the chat_input branch so every rerun re-renders the latest build
+if st.session_state.get("last_ppt"):
+    pptx_bytes, filename = st.session_state.last_ppt
+    st.download_button(
+        label="📥 Download .pptx",
+        data=pptx_bytes,
+        file_name=filename,
+        mime="application/vnd.openxmlformats-officedocument.presentationml.presentation"
+    )
@@ -1,91 +1,221 @@
 import os
 import json
+import hashlib
 import requests
 import math
+import bisect
 import time
+import threading
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from groq import Groq
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.text import MSO_ANCHOR, PP_ALIGN
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_SHAPE
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+from pptx.text.text import _Paragraph
 from dotenv import load_dotenv
 import uuid
+from copy import deepcopy
+import streamlit as st
+
+
+# orjson parses LLM output faster; fall back to the stdlib if it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 # Load environment variables from .env file immediately
 load_dotenv()
 
 
+def loads_json(text):
+    """Parses JSON with orjson when available; raises json.JSONDecodeError either way"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def dumps_json(obj):
+    """Serializes to a JSON string with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def parse_plan(slide_data):
+    """Accepts a parsed plan dict or its raw JSON string; returns the dict, or None if malformed"""
+    if isinstance(slide_data, dict):
+        return slide_data
+    try:
+        return loads_json(slide_data)
+    except json.JSONDecodeError:
+        return None
+
+
 # Global defaults from Environment Variables
-client = None
 # Default to a common Groq model, user can override in .env
 model_name = os.getenv("GROQ_MODEL_NAME")
 pexels_api_key = os.getenv("PEXELS_API_KEY")
 
 
-def initialize_client():
+# Shared HTTP session so Pexels searches and image downloads reuse keep-alive
+# connections; rate limits and gateway errors are retried by urllib3 with
+# exponential backoff instead of sleeping linearly on the caller's thread
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504])
+))
+IMAGE_WORKERS = 8
+MAX_IMAGE_BYTES = 2_000_000
+IMAGE_CHUNK_SIZE = 65536
+
+
+# Process-wide memo of Pexels lookups (prompt -> url) and downloads (url -> bytes).
+# Only successes are stored so a transient failure can be retried later.
+_url_cache = {}
+_bytes_cache = {}
+IMAGE_CACHE_MAX = 64
+_cache_lock = threading.Lock()
+
+
+def _remember(cache, key, value, max_entries=IMAGE_CACHE_MAX):
+    """Stores value under key, evicting the oldest entry once the cache is full"""
+    with _cache_lock:
+        if len(cache) >= max_entries and key not in cache:
+            cache.pop(next(iter(cache)), None)
+        cache[key] = value
+
+
+@st.cache_resource(show_spinner=False)
+def _build_groq_client():
     """
-    Attempts to initialize the Groq client using Environment Variables.
+    Builds the Groq client once per process from Environment Variables.
+    Streamlit reruns reuse the same client (and its connection pool). Raises on
+    failure so that Streamlit does not cache it and the next call retries.
     """
-    global client
+    # Pick up a GROQ_API_KEY added to .env after startup
+    load_dotenv()
     api_key = os.getenv("GROQ_API_KEY")
-   
-    if api_key:
-        try:
-            client = Groq(api_key=api_key)
-            return True
-        except Exception as e:
-            print(f"Groq Init Failed: {e}")
-            return False
-    return False
+    if not api_key:
+        raise RuntimeError("GROQ_API_KEY not found in environment variables.")
+    return Groq(api_key=api_key)
+
+
+def get_groq_client():
+    """Returns the shared Groq client, or None if it can't be initialized yet."""
+    try:
+        return _build_groq_client()
+    except Exception as e:
+        print(f"Groq Init Failed: {e}")
+        return None
+
+
+# Invariant system prompt, kept byte-identical across calls (no f-string, no
+# per-request data) so Groq's server-side prefix cache can reuse it. Anything
+# that varies per request goes in the user message after this prefix.
+SYSTEM_PROMPT_PREFIX = """
+You are a Professional PowerPoint Content Generator.
+Your goal is to create a detailed and informative presentation.
+
+Structure Requirements:
+1.  **Title Slide**: A catchy title for the presentation.
+2.  **Table of Contents**: A list of the titles of ALL content slides.
+3.  **Content Slides**: Create 5 content slides by default. If the user requests a specific number of slides, generate that many. Each slide must have a title and exactly 3 descriptive bullet points.
+4.  **Conclusion Slide**: A summary of the key takeaways. Provide exactly 3 concise bullet points.
+
+Output strictly in JSON format with this structure:
+{
+    "presentation_title": "Main Title of Presentation",
+    "table_of_contents": ["Slide 1 Title", "Slide 2 Title", "Slide 3 Title", "Slide 4 Title", "Slide 5 Title"],
+    "slides": [
+        {
+            "title": "Slide Title",
+            "content": [
+                "Detailed bullet point 1.",
+                "Detailed bullet point 2.",
+                "Detailed bullet point 3."
+            ],
+            "image_description": "A search query for a stock photo website (e.g., 'business meeting', 'nature landscape')."
+        }
+    ],
+    "conclusion": {
+        "title": "Conclusion",
+        "content": ["Concise takeaway 1", "Concise takeaway 2", "Concise takeaway 3"]
+    }
+}
+Do not include markdown formatting like ```json.
+"""
+
+
+def _content_cache_key(topic, feedback=None, current_content=None):
+    """Stable digest of everything that shapes the LLM output."""
+    parts = (model_name or "", topic or "", feedback or "", current_content or "")
+    return hashlib.blake2b("\x00".join(parts).encode("utf-8")).hexdigest()
 
 
-# Try to initialize immediately
-initialize_client()
+# Completed LLM responses (cache_key -> (timestamp, raw JSON string)). Kept as a
+# plain dict rather than st.cache_data because the streaming path writes to a
+# UI placeholder that lives outside the cached call.
+_completion_cache = {}
+COMPLETION_CACHE_TTL = 3600
+COMPLETION_CACHE_MAX = 128
+
+
+def _cached_completion(cache_key):
+    """Returns a cached completion that is still within its TTL, or None"""
+    entry = _completion_cache.get(cache_key)
+    if entry and time.time() - entry[0] < COMPLETION_CACHE_TTL:
+        return entry[1]
+    return None
+
+
+def _stream_completion(client, user_prompt, on_token=None):
+    """
+    Streams a Groq completion, handing the accumulated text to on_token as it
+    grows. Returns the full JSON string once the stream ends.
+    """
+    response = client.chat.completions.create(
+        model=model_name,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT_PREFIX},
+            {"role": "user", "content": user_prompt}
+        ],
+        response_format={"type": "json_object"},
+        temperature=0.7,
+        stream=True
+    )
+    acc = ""
+    for chunk in response:
+        piece = chunk.choices[0].delta.content or ""
+        if piece:
+            acc += piece
+            if on_token:
+                on_token(acc)
+    return acc
 
 
 # AGENT 1 - CONTENT GENERATOR
-def generate_slide_content(topic, feedback=None, current_content=None):
+def generate_slide_content(topic, feedback=None, current_content=None, on_token=None):
+    client = get_groq_client()
     if not client:
-        # Try one last time to init from env if client is missing
-        if not initialize_client():
-            return "Error: Groq Client not initialized. Check your .env file for GROQ_API_KEY."
+        return "Error: Groq Client not initialized. Check your .env file for GROQ_API_KEY."
+
+
+    # The draft is kept parsed in session state; only stringify it for the prompt
+    if isinstance(current_content, dict):
+        current_content = dumps_json(current_content)
 
 
-    system_prompt = """
-    You are a Professional PowerPoint Content Generator.
-    Your goal is to create a detailed and informative presentation.
-   
-    Structure Requirements:
-    1.  **Title Slide**: A catchy title for the presentation.
-    2.  **Table of Contents**: A list of the titles of ALL content slides.
-    3.  **Content Slides**: Create 5 content slides by default. If the user requests a specific number of slides, generate that many. Each slide must have a title and exactly 3 descriptive bullet points.
-    4.  **Conclusion Slide**: A summary of the key takeaways. Provide exactly 3 concise bullet points.
-   
-    Output strictly in JSON format with this structure:
-    {
-        "presentation_title": "Main Title of Presentation",
-        "table_of_contents": ["Slide 1 Title", "Slide 2 Title", "Slide 3 Title", "Slide 4 Title", "Slide 5 Title"],
-        "slides": [
-            {
-                "title": "Slide Title",
-                "content": [
-                    "Detailed bullet point 1.",
-                    "Detailed bullet point 2.",
-                    "Detailed bullet point 3."
-                ],
-                "image_description": "A search query for a stock photo website (e.g., 'business meeting', 'nature landscape')."
-            }
-        ],
-        "conclusion": {
-            "title": "Conclusion",
-            "content": ["Concise takeaway 1", "Concise takeaway 2", "Concise takeaway 3"]
-        }
-    }
-    Do not include markdown formatting like ```json.
-    """
-   
     user_prompt = f"Create a presentation about: {topic}"
    
     if feedback and current_content:
@@ -96,17 +226,18 @@ def generate_slide_content(topic, feedback=None, current_content=None):
         """
 
 
+    cache_key = _content_cache_key(topic, feedback, current_content)
+    cached = _cached_completion(cache_key)
+    if cached is not None:
+        return cached
+
+
     try:
-        response = client.chat.completions.create(
-            model=model_name,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.7
-        )
-        return response.choices[0].message.content
+        content = _stream_completion(client, user_prompt, on_token)
+        # Only cache usable plans so an empty/truncated reply can be retried
+        if parse_plan(content) is not None:
+            _remember(_completion_cache, cache_key, (time.time(), content), COMPLETION_CACHE_MAX)
+        return content
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -119,6 +250,10 @@ def generate_image(prompt):
         return None
 
 
+    if prompt in _url_cache:
+        return _url_cache[prompt]
+
+
     print(f"Searching Pexels for: '{prompt}'...")
     try:
         headers = {
@@ -129,15 +264,17 @@ def generate_image(prompt):
             'query': prompt,
             'per_page': 1,
             'orientation': 'landscape',
-            'size': 'large'
+            'size': 'medium'
         }
-        response = requests.get('https://api.pexels.com/v1/search', headers=headers, params=params, timeout=10)
+        response = _SESSION.get('https://api.pexels.com/v1/search', headers=headers, params=params, timeout=10)
        
         if response.status_code == 200:
             data = response.json()
             if data.get('photos'):
-                image_url = data['photos'][0]['src']['landscape']
+                # Slides render images ~3.5in wide, so the 'medium' variant is plenty
+                image_url = data['photos'][0]['src']['medium']
                 print(f"Image found: {image_url}")
+                _remember(_url_cache, prompt, image_url)
                 return image_url
             else:
                 print(f"No images found on Pexels for: '{prompt}'")
@@ -150,24 +287,192 @@ def generate_image(prompt):
         return None
 
 
-# PPT CREATOR - COMBINING THE EXTRACTED RESOURCES INTO ONE PRESENTATION
-def create_ppt_file(slide_data, include_images=True, theme_color='#003366'):
-    try:
-        data = json.loads(slide_data)
-    except json.JSONDecodeError:
+def _read_capped(resp):
+    """Reads a streamed response body, giving up once it exceeds MAX_IMAGE_BYTES"""
+    declared = resp.headers.get('Content-Length')
+    if declared and declared.isdigit() and int(declared) > MAX_IMAGE_BYTES:
         return None
+    buf = bytearray()
+    for chunk in resp.iter_content(IMAGE_CHUNK_SIZE):
+        buf += chunk
+        if len(buf) > MAX_IMAGE_BYTES:
+            # A truncated JPEG would embed as a broken picture, so drop it entirely
+            return None
+    return bytes(buf)
+
+
+def fetch_image(url, timeout=30):
+    """Downloads image bytes from a URL (retries are handled by the shared session)"""
+    if url in _bytes_cache:
+        return _bytes_cache[url]
+
+
+    print(f"Downloading image from: {url}")
+    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+    try:
+        with _SESSION.get(url, stream=True, timeout=timeout, headers=headers) as resp:
+            if resp.status_code == 200:
+                content = _read_capped(resp)
+                if content is None:
+                    print(f"Image skipped: larger than {MAX_IMAGE_BYTES} bytes")
+                    return None
+                print("Image downloaded successfully.")
+                _remember(_bytes_cache, url, content)
+                return content
+            else:
+                print(f"Image download failed: {resp.status_code}")
+    except requests.RequestException as e:
+        print(f"Image download error: {e}")
+    return None
+
+
+def _fan_out(func, items):
+    """Runs func once per unique truthy item on the pool and maps results back by index"""
+    unique = list(dict.fromkeys(item for item in items if item))
+    if not unique:
+        return [None] * len(items)
+    with ThreadPoolExecutor(max_workers=IMAGE_WORKERS) as pool:
+        results = dict(zip(unique, pool.map(func, unique)))
+    return [results.get(item) if item else None for item in items]
+
+
+def generate_images(prompts):
+    """Looks up a Pexels image URL for each prompt, searching each distinct prompt once"""
+    return _fan_out(generate_image, prompts)
+
+
+def fetch_slide_images(descriptions):
+    """Fetches images for all slides concurrently, preserving slide order"""
+    urls = generate_images(descriptions)
+    return _fan_out(fetch_image, urls)
+
+
+def prefetch_slide_images(slide_data):
+    """
+    Warms the Pexels URL/bytes caches for a draft plan so that, once the user
+    confirms, create_ppt_file finds its images already downloaded.
+    """
+    data = parse_plan(slide_data)
+    if data is None:
+        return
+    fetch_slide_images([s.get('image_description') for s in data.get('slides', [])])
+
+
+# Geometry and font sizes reused across every deck, built once at import
+IN_0 = Inches(0)
+IN_0_03 = Inches(0.03)
+IN_0_05 = Inches(0.05)
+IN_0_3 = Inches(0.3)
+IN_0_5 = Inches(0.5)
+IN_0_8 = Inches(0.8)
+IN_1 = Inches(1)
+IN_1_1 = Inches(1.1)
+IN_1_4 = Inches(1.4)
+IN_1_5 = Inches(1.5)
+IN_2 = Inches(2)
+IN_3 = Inches(3)
+IN_3_5 = Inches(3.5)
+IN_3_9 = Inches(3.9)
+IN_4 = Inches(4)
+IN_5 = Inches(5)
+IN_5_5 = Inches(5.5)
+IN_5_625 = Inches(5.625)
+IN_6 = Inches(6)
+IN_8 = Inches(8)
+IN_9 = Inches(9)
+IN_10 = Inches(10)
+
+PT_2 = Pt(2)
+PT_4 = Pt(4)
+PT_6 = Pt(6)
+PT_8 = Pt(8)
+PT_10 = Pt(10)
+PT_12 = Pt(12)
+PT_14 = Pt(14)
+PT_16 = Pt(16)
+PT_20 = Pt(20)
+PT_24 = Pt(24)
+PT_26 = Pt(26)
+PT_28 = Pt(28)
+PT_32 = Pt(32)
+PT_38 = Pt(38)
+PT_44 = Pt(44)
+PT_54 = Pt(54)
+
+DARK_GRAY = RGBColor(80, 80, 80)
+WHITE = RGBColor(255, 255, 255)
+
+
+# Dynamic sizing ladders: text longer than bins[k] (strictly) moves to step k+1
+TITLE_BINS, TITLE_SIZES = (25, 40), (PT_44, PT_38, PT_32)
+SLIDE_TITLE_BINS, SLIDE_TITLE_SIZES = (35, 50), (PT_28, PT_26, PT_24)
+TOC_BINS, TOC_STYLES = (5, 8), ((PT_20, PT_14), (PT_16, PT_12), (PT_14, PT_8))
+CONTENT_BINS, CONTENT_STYLES = (400, 600), ((PT_16, PT_8), (PT_14, PT_6), (PT_12, PT_4))
+CONCLUSION_BINS, CONCLUSION_STYLES = (300, 500), ((PT_20, PT_14), (PT_16, PT_10), (PT_14, PT_8))
+
+
+def _by_length(bins, steps, length):
+    """Picks the step for a length from a ladder of strict '>' thresholds"""
+    return steps[bisect.bisect_left(bins, length)]
+
+
+def _bullet_paragraph_template(font_size, spacing, color):
+    """
+    Builds the <a:p> that tf.add_paragraph() plus the level/font/spacing setters
+    would produce; the bullet text itself is set through python-pptx.
+    """
+    spacing_pts = int(spacing.pt * 100)
+    return parse_xml(
+        f'<a:p {nsdecls("a")}>'
+        f'<a:pPr>'
+        f'<a:spcBef><a:spcPts val="{spacing_pts}"/></a:spcBef>'
+        f'<a:spcAft><a:spcPts val="{spacing_pts}"/></a:spcAft>'
+        f'<a:defRPr sz="{int(font_size.pt * 100)}">'
+        f'<a:solidFill><a:srgbClr val="{color}"/></a:solidFill>'
+        f'</a:defRPr>'
+        f'</a:pPr>'
+        f'</a:p>'
+    )
+
+
+def hex_to_rgb(hex_color):
+    """Converts '#rrggbb' to an (r, g, b) tuple; raises ValueError if malformed"""
+    r, g, b = bytes.fromhex(hex_color.lstrip('#'))
+    return r, g, b
 
 
-    prs = Presentation()
-    # Set slide dimensions for widescreen 16:9
-    prs.slide_width = Inches(10)
-    prs.slide_height = Inches(5.625)
+# Serialized empty 16:9 deck, built on first use and reopened from memory per call
+_base_deck_bytes = None
 
 
-    # Helper to convert hex to RGB
-    def hex_to_rgb(hex_color):
-        hex_color = hex_color.lstrip('#')
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+def _new_presentation():
+    """Returns a fresh widescreen Presentation without re-reading python-pptx's default template from disk"""
+    global _base_deck_bytes
+    if _base_deck_bytes is None:
+        prs = Presentation()
+        # Set slide dimensions for widescreen 16:9
+        prs.slide_width = IN_10
+        prs.slide_height = IN_5_625
+        buffer = BytesIO()
+        prs.save(buffer)
+        _base_deck_bytes = buffer.getvalue()
+    return Presentation(BytesIO(_base_deck_bytes))
+
+
+# PPT CREATOR - COMBINING THE EXTRACTED RESOURCES INTO ONE PRESENTATION
+def create_ppt_file(slide_data, include_images=True, theme_color='#003366', on_progress=None):
+    # on_progress(fraction, message) may be called from a worker thread, so it must not touch Streamlit
+    def report(fraction, message):
+        if on_progress:
+            on_progress(fraction, message)
+
+
+    data = parse_plan(slide_data)
+    if data is None:
+        return None
+
+
+    prs = _new_presentation()
 
 
     # Theme Colors
@@ -178,34 +483,13 @@ def create_ppt_file(slide_data, include_images=True, theme_color='#003366'):
         NAVY_BLUE = RGBColor(0, 51, 102) # Fallback
 
 
-    DARK_GRAY = RGBColor(80, 80, 80)
-
-
-    def fetch_image(url, retries=3, timeout=30):
-        print(f"Downloading image from: {url}")
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        for attempt in range(retries):
-            try:
-                resp = requests.get(url, timeout=timeout, headers=headers)
-                if resp.status_code == 200:
-                    print("Image downloaded successfully.")
-                    return resp.content
-                else:
-                    print(f"Image download failed: {resp.status_code}")
-            except Exception as e:
-                print(f"Image download error (Attempt {attempt+1}): {e}")
-            time.sleep(1 * (attempt + 1))
-        print("Failed to download image after retries.")
-        return None
-
-
     # 1. Title Slide
     slide_layout = prs.slide_layouts[6] # Blank for custom
     slide = prs.slides.add_slide(slide_layout)
    
     # Decorative Bar
     shape = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE, Inches(0), Inches(0), Inches(10), Inches(0.5)
+        MSO_SHAPE.RECTANGLE, IN_0, IN_0, IN_10, IN_0_5
     )
     shape.fill.solid()
     shape.fill.fore_color.rgb = NAVY_BLUE
@@ -214,7 +498,7 @@ def create_ppt_file(slide_data, include_images=True, theme_color='#003366'):
 
     # Title
     title_text = data.get('presentation_title', 'Presentation')
-    title_box = slide.shapes.add_textbox(Inches(1), Inches(2), Inches(8), Inches(1.5))
+    title_box = slide.shapes.add_textbox(IN_1, IN_2, IN_8, IN_1_5)
     tf = title_box.text_frame
     tf.word_wrap = True
     p = tf.add_paragraph()
@@ -224,20 +508,15 @@ def create_ppt_file(slide_data, include_images=True, theme_color='#003366'):
     p.alignment = PP_ALIGN.CENTER
    
     # Dynamic Title Sizing
-    if len(title_text) > 40:
-        p.font.size = Pt(32)
-    elif len(title_text) > 25:
-        p.font.size = Pt(38)
-    else:
-        p.font.size = Pt(44)
+    p.font.size = _by_length(TITLE_BINS, TITLE_SIZES, len(title_text))
 
 
     # Subtitle
-    sub_box = slide.shapes.add_textbox(Inches(1), Inches(3.5), Inches(8), Inches(1))
+    sub_box = slide.shapes.add_textbox(IN_1, IN_3_5, IN_8, IN_1)
     tf = sub_box.text_frame
     p = tf.add_paragraph()
     p.text = "Generated by AI Agent"
-    p.font.size = Pt(20)
+    p.font.size = PT_20
     p.font.color.rgb = DARK_GRAY
     p.alignment = PP_ALIGN.CENTER
 
@@ -247,18 +526,18 @@ def create_ppt_file(slide_data, include_images=True, theme_color='#003366'):
     slide = prs.slides.add_slide(slide_layout)
    
     # Title
-    title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(1))
+    title_box = slide.shapes.add_textbox(IN_0_5, IN_0_5, IN_9, IN_1)
     tf = title_box.text_frame
     p = tf.add_paragraph()
     p.text = "Table of Contents"
     p.font.bold = True
-    p.font.size = Pt(32)
+    p.font.size = PT_32
     p.font.color.rgb = NAVY_BLUE
     p.alignment = PP_ALIGN.CENTER
    
     # Separator Line
     line = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE, Inches(4), Inches(1.5), Inches(2), Inches(0.05)
+        MSO_SHAPE.RECTANGLE, IN_4, IN_1_5, IN_2, IN_0_05
     )
     line.fill.solid()
     line.fill.fore_color.rgb = NAVY_BLUE
@@ -269,15 +548,7 @@ def create_ppt_file(slide_data, include_images=True, theme_color='#003366'):
     item_count = len(toc_items)
    
     # Dynamic ToC Sizing
-    if item_count > 8:
-        toc_font_size = Pt(14)
-        toc_spacing = Pt(8)
-    elif item_count > 5:
-        toc_font_size = Pt(16)
-        toc_spacing = Pt(12)
-    else:
-        toc_font_size = Pt(20)
-        toc_spacing = Pt(14)
+    toc_font_size, toc_spacing = _by_length(TOC_BINS, TOC_STYLES, item_count)
 
 
     # Aggressive 2-column switch to prevent overflow
@@ -288,7 +559,7 @@ def create_ppt_file(slide_data, include_images=True, theme_color='#003366'):
         col2_items = toc_items[mid:]
        
         # Column 1
-        box1 = slide.shapes.add_textbox(Inches(1), Inches(2), Inches(4), Inches(3))
+        box1 = slide.shapes.add_textbox(IN_1, IN_2, IN_4, IN_3)
         tf1 = box1.text_frame
         tf1.word_wrap = True
         for item in col1_items:
@@ -299,7 +570,7 @@ def create_ppt_file(slide_data, include_images=True, theme_color='#003366'):
             p.font.color.rgb = DARK_GRAY
            
         # Column 2
-        box2 = slide.shapes.add_textbox(Inches(5.5), Inches(2), Inches(4), Inches(3))
+        box2 = slide.shapes.add_textbox(IN_5_5, IN_2, IN_4, IN_3)
         tf2 = box2.text_frame
         tf2.word_wrap = True
         for item in col2_items:
@@ -310,7 +581,7 @@ def create_ppt_file(slide_data, include_images=True, theme_color='#003366'):
             p.font.color.rgb = DARK_GRAY
     else:
         # Single Column Centered
-        box = slide.shapes.add_textbox(Inches(2), Inches(2), Inches(6), Inches(3))
+        box = slide.shapes.add_textbox(IN_2, IN_2, IN_6, IN_3)
         tf = box.text_frame
         tf.word_wrap = True
         for item in toc_items:
@@ -324,13 +595,22 @@ def create_ppt_file(slide_data, include_images=True, theme_color='#003366'):
 
     # 3. Content Slides
     slides_content = data.get('slides', [])
+    # Image search + download is pure network I/O, so run it for every slide up front
+    if include_images:
+        report(0.1, "Fetching images...")
+        img_blobs = fetch_slide_images([s.get('image_description') for s in slides_content])
+    else:
+        img_blobs = [None] * len(slides_content)
+
+
     for i, slide_info in enumerate(slides_content):
+        report(0.6 + 0.3 * i / max(len(slides_content), 1), f"Building slide {i + 1} of {len(slides_content)}...")
         slide = prs.slides.add_slide(prs.slide_layouts[6]) # Blank
 
 
         # Title
         slide_title = slide_info.get('title', 'Slide')
-        title_shape = slide.shapes.add_textbox(Inches(0.5), Inches(0.3), Inches(9), Inches(0.8))
+        title_shape = slide.shapes.add_textbox(IN_0_5, IN_0_3, IN_9, IN_0_8)
         tframe = title_shape.text_frame
         tframe.word_wrap = True
         tp = tframe.paragraphs[0]
@@ -339,45 +619,34 @@ def create_ppt_file(slide_data, include_images=True, theme_color='#003366'):
         tp.font.color.rgb = NAVY_BLUE
        
         # Dynamic Title Font
-        if len(slide_title) > 50:
-            tp.font.size = Pt(24)
-        elif len(slide_title) > 35:
-            tp.font.size = Pt(26)
-        else:
-            tp.font.size = Pt(28)
+        tp.font.size = _by_length(SLIDE_TITLE_BINS, SLIDE_TITLE_SIZES, len(slide_title))
        
         # Separator Line
         line = slide.shapes.add_shape(
-            MSO_SHAPE.RECTANGLE, Inches(0.5), Inches(1.1), Inches(9), Inches(0.03)
+            MSO_SHAPE.RECTANGLE, IN_0_5, IN_1_1, IN_9, IN_0_03
         )
         line.fill.solid()
         line.fill.fore_color.rgb = NAVY_BLUE
         line.line.fill.background()
 
 
-        # Try image download first
-        img_data = None
-        img_url = None
-        if include_images and slide_info.get("image_description"):
-            img_url = generate_image(slide_info['image_description'])
-            if img_url:
-                img_data = fetch_image(img_url)
+        img_data = img_blobs[i]
 
 
         has_image = img_data is not None
        
         # Content Layout
         if has_image:
-            content_width = 5.0
-            image_x = Inches(6.0)
-            image_y = Inches(2.0) # Moved down
-            image_w = Inches(3.5)
+            content_width = IN_5
+            image_x = IN_6
+            image_y = IN_2 # Moved down
+            image_w = IN_3_5
         else:
-            content_width = 9.0 # Full width if no image
+            content_width = IN_9 # Full width if no image
 
 
         # Content box
-        content_shape = slide.shapes.add_textbox(Inches(0.5), Inches(1.4), Inches(content_width), Inches(3.9))
+        content_shape = slide.shapes.add_textbox(IN_0_5, IN_1_4, content_width, IN_3_9)
         tf = content_shape.text_frame
         tf.word_wrap = True
         tf.vertical_anchor = MSO_ANCHOR.TOP
@@ -390,82 +659,61 @@ def create_ppt_file(slide_data, include_images=True, theme_color='#003366'):
 
         # Calculate total text length to determine font size
         total_chars = sum(len(b) for b in bullets)
-       
-        if total_chars > 600:
-            content_font_size = Pt(12)
-            content_spacing = Pt(4)
-        elif total_chars > 400:
-            content_font_size = Pt(14)
-            content_spacing = Pt(6)
-        else:
-            content_font_size = Pt(16)
-            content_spacing = Pt(8)
+        content_font_size, content_spacing = _by_length(CONTENT_BINS, CONTENT_STYLES, total_chars)
 
 
-        for idx, bullet in enumerate(bullets):
-            p = tf.add_paragraph()
-            p.text = f"• {bullet}"
-            p.level = 0
-            p.font.size = content_font_size
-            p.font.color.rgb = DARK_GRAY
-            p.space_before = content_spacing
-            p.space_after = content_spacing
+        # Clone one pre-styled <a:p> per bullet rather than setting each property
+        template = _bullet_paragraph_template(content_font_size, content_spacing, DARK_GRAY)
+        for bullet in bullets:
+            node = deepcopy(template)
+            tf._txBody.append(node)
+            # _Paragraph.text handles line breaks and escapes XML-invalid characters
+            _Paragraph(node, tf).text = f"• {bullet}"
 
 
         # Image placement
         if has_image:
             try:
-                temp_filename = f"temp_img_{i}.jpg"
-                with open(temp_filename, 'wb') as f:
-                    f.write(img_data)
                 # Add a border to image
-                pic = slide.shapes.add_picture(temp_filename, image_x, image_y, width=image_w)
+                pic = slide.shapes.add_picture(BytesIO(img_data), image_x, image_y, width=image_w)
                 line = pic.line
                 line.color.rgb = NAVY_BLUE
-                line.width = Pt(2)
-                os.remove(temp_filename)
+                line.width = PT_2
             except Exception as e:
                 print(f"Image placement failed: {e}")
 
 
     # 4. Conclusion Slide
+    report(0.9, "Finishing up...")
     conclusion_data = data.get('conclusion', {})
     slide = prs.slides.add_slide(prs.slide_layouts[6]) # Blank
    
     # Title
-    title_shape = slide.shapes.add_textbox(Inches(0.5), Inches(0.3), Inches(9), Inches(0.8))
+    title_shape = slide.shapes.add_textbox(IN_0_5, IN_0_3, IN_9, IN_0_8)
     tframe = title_shape.text_frame
     tp = tframe.paragraphs[0]
     tp.text = conclusion_data.get('title', 'Conclusion')
     tp.font.bold = True
-    tp.font.size = Pt(28)
+    tp.font.size = PT_28
     tp.font.color.rgb = NAVY_BLUE
    
     # Separator Line
     line = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE, Inches(0.5), Inches(1.1), Inches(9), Inches(0.03)
+        MSO_SHAPE.RECTANGLE, IN_0_5, IN_1_1, IN_9, IN_0_03
     )
     line.fill.solid()
     line.fill.fore_color.rgb = NAVY_BLUE
     line.line.fill.background()
    
     # Content
-    content_shape = slide.shapes.add_textbox(Inches(1), Inches(1.5), Inches(8), Inches(3.5))
+    content_shape = slide.shapes.add_textbox(IN_1, IN_1_5, IN_8, IN_3_5)
     tf = content_shape.text_frame
     tf.word_wrap = True
     conc_points = conclusion_data.get('content', [])
    
     # Dynamic Conclusion Sizing
     total_conc_chars = sum(len(p) for p in conc_points)
-    if total_conc_chars > 500:
-        conc_font_size = Pt(14)
-        conc_spacing = Pt(8)
-    elif total_conc_chars > 300:
-        conc_font_size = Pt(16)
-        conc_spacing = Pt(10)
-    else:
-        conc_font_size = Pt(20)
-        conc_spacing = Pt(14)
+    conc_font_size, conc_spacing = _by_length(CONCLUSION_BINS, CONCLUSION_STYLES, total_conc_chars)
 
 
     for point in conc_points:
@@ -487,18 +735,21 @@ def create_ppt_file(slide_data, include_images=True, theme_color='#003366'):
     fill.fore_color.rgb = NAVY_BLUE
    
     # Center text box
-    txBox = slide.shapes.add_textbox(Inches(2), Inches(2), Inches(6), Inches(2))
+    txBox = slide.shapes.add_textbox(IN_2, IN_2, IN_6, IN_2)
     tf = txBox.text_frame
     tf.word_wrap = True
     p = tf.add_paragraph()
     p.text = "Thank You"
     p.font.bold = True
-    p.font.size = Pt(54)
-    p.font.color.rgb = RGBColor(255, 255, 255) # White text
+    p.font.size = PT_54
+    p.font.color.rgb = WHITE # White text
     p.alignment = PP_ALIGN.CENTER
 
 
     unique_id = uuid.uuid4().hex[:6]
     filename = f"generated_presentation_{unique_id}.pptx"
-    prs.save(filename)
-    return filename
+    # Serialize in memory; the caller hands the bytes straight to the download button
+    buffer = BytesIO()
+    prs.save(buffer)
+    report(1.0, "Done")
+    return buffer.getvalue(), filename